@@ -2,6 +2,9 @@
 
 import logging
 import threading
+from time import monotonic
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+from queue import SimpleQueue
 from core import client, StopException, conf, state
 from core import STARTING, RUNNING, STOPPING
 from menus import start
@@ -21,14 +24,40 @@ state(STARTING)
 logging.root.setLevel(logging.DEBUG)
 
 
+class LogBuffer(MemoryHandler):
+    """Hold log records and write them to the target stream in one batch."""
+
+    def flush(self):
+        with self.lock:
+            if self.target and self.buffer:
+                target = self.target
+                try:
+                    target.stream.write(''.join(target.format(record) + target.terminator
+                                                for record in self.buffer))
+                    target.stream.flush()
+                except Exception:
+                    # report the failure without killing the log thread
+                    target.handleError(self.buffer[-1])
+                self.buffer.clear()
+
+
 # store log
 try:
-    log_file = open('general.log', 'a')
+    log_file = open('general.log', 'a', buffering=64 * 1024)
 except FileNotFoundError:
-    log_file = open('general.log', 'w')
+    log_file = open('general.log', 'w', buffering=64 * 1024)
 r_handler = logging.StreamHandler(log_file)
 r_handler.setFormatter(logging.Formatter('%(asctime)s: %(name)s - %(levelname)s - %(message)s'))
-logging.root.addHandler(r_handler)
+# write records out every 512 entries or immediately on errors
+b_handler = LogBuffer(512, logging.ERROR, r_handler)
+# format and write records on a separate thread
+log_queue = SimpleQueue()
+listener = QueueListener(log_queue, b_handler)
+logging.root.addHandler(QueueHandler(log_queue))
+# the listener's thread is the only one started here
+started = set(threading.enumerate())
+listener.start()
+log_threads = set(threading.enumerate()) - started
 
 
 logging.root.info('starting up p2pg')
@@ -37,12 +66,24 @@ logging.root.info('starting up p2pg')
 def close():
     """Ensure that threads have config available."""
     state(STOPPING)
-    for th in threading.enumerate():
-        assert isinstance(th, threading.Thread)
-        if th is not threading.main_thread():
-            print('Shutting down %s thread...' % th.name)
-            th.join()
+    # the log thread keeps running until everything else has shut down,
+    # and pending config timers are cancelled and flushed by conf.close()
+    threads = [th for th in threading.enumerate()
+               if th is not threading.main_thread() and th not in log_threads
+               and not isinstance(th, threading.Timer)]
+    if threads:
+        print('Shutting down %s thread%s...' % (len(threads), '' if len(threads) == 1 else 's'))
+    # give all threads one shared grace period
+    deadline = monotonic() + 5
+    for th in threads:
+        th.join(max(0, deadline - monotonic()))
+    for th in threads:
+        if th.is_alive():
+            print('Thread %s did not shut down.' % th.name)
     conf.close()
+    # drain the log queue before the records are written out
+    listener.stop()
+    b_handler.close()
     log_file.close()
 
 
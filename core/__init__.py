@@ -1,7 +1,9 @@
 """The core of p2pg."""
 
 import logging
+from sys import intern
 from threading import Lock
+from types import MappingProxyType
 from .conf import conf, dump_after
 
 
@@ -12,13 +14,14 @@ __website__ = 'https://p2pg.sigm.io/'
 __support__ = 'https://p2pg.sigm.io/support/'
 
 
-info_form = {
+# read only view of project information for doc formatting
+info_form = MappingProxyType({k: intern(v) for k, v in {
     'author': __author__,
     'copyright': __copyright__,
     'copy-link': __copy_link__,
     'website': __website__,
     'support': __support__
-}
+}.items()})
 
 
 log = logging.getLogger(__name__)
@@ -27,11 +30,14 @@ log = logging.getLogger(__name__)
 class StopException(Exception):
     def __init__(self, reason):
         super().__init__()
-        log.info('stop exception raised because of %s', reason)
+        if log.isEnabledFor(logging.INFO):
+            log.info('stop exception raised because of %s', reason)
         self.reason = reason
 
 
 class StateTracker:
+    __slots__ = ('_val', '_lock')
+
     def __init__(self, n_state):
         self._val = n_state
         self._lock = Lock()
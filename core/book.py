@@ -2,19 +2,14 @@ from core.node import Node
 
 
 def book_str(nodes: [Node]):
-    book = []
-    for node in nodes:
-        book.append(node.msg.decode('utf-8'))
-    return '\n'.join(book) + '\n'
+    # join the raw messages first so only one decode is needed
+    return book_bytes(nodes).decode('utf-8')
 
 
 def book_bytes(nodes: [Node]):
-    book = []
-    for node in nodes:
-        book.append(node.msg)
-    return b'\n'.join(book) + b'\n'
+    return b'\n'.join([node.msg for node in nodes]) + b'\n'
 
 
 def book_iter(nodes: [Node], string=False):
     for node in nodes:
-        yield (node.msg.decode('utf-8') + '\n') if string else (node.msg + b'\n')
+        yield (node.text + '\n') if string else (node.msg + b'\n')
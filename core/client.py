@@ -1,10 +1,25 @@
 """Manage the p2pg client side display."""
 
+import sys
+from os import environ
 from logging import getLogger, Logger, NullHandler
 from core import info_form, conf, StopException
 from weakref import ref
 from collections import namedtuple
-from textwrap import dedent, wrap
+from functools import lru_cache
+from textwrap import dedent, TextWrapper
+
+
+# single key input is platform specific
+try:
+    from msvcrt import getwch
+except ImportError:
+    getwch = None
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = tty = None
 
 
 log = getLogger(__name__)
@@ -14,14 +29,30 @@ class Error(Exception):
     pass
 
 
+# erase the screen and home the cursor on terminals that understand it
+_CLEAR = '\x1b[2J\x1b[H'
+_ansi = sys.stdout.isatty() and environ.get('TERM', 'dumb') != 'dumb'
+
+
+@lru_cache(maxsize=4)
+def _scroll(n):
+    """Newlines used to push old output off screen."""
+    return '\n' * (n + 1)
+
+
 def clear():
     """Clear screen."""
     if conf.clear_menu:
-        print('\n' * conf.clear_len)
+        sys.stdout.write(_CLEAR if _ansi else _scroll(conf.clear_len))
 
 
-def form_doc(doc):
-    """Trim docstring for printing."""
+# shared wrapper, width is updated before each use
+_wrapper = TextWrapper()
+
+
+@lru_cache(maxsize=32)
+def _split_doc(doc):
+    """Fill in and dedent a docstring, returning its header and body lines."""
 
     i = doc.find('\n') + 1
     doc = doc % info_form
@@ -30,15 +61,76 @@ def form_doc(doc):
     body = doc[i:]
     body = dedent(body)
 
-    lines = body.split('\n')
+    return header, tuple(body.split('\n'))
+
+
+def form_doc(doc):
+    """Trim docstring for printing."""
+    return _form_doc(doc, conf.terminal_width)
+
+
+@lru_cache(maxsize=256)
+def _form_doc(doc, width):
+    header, lines = _split_doc(doc)
+    _wrapper.width = width
     wrapped = []
-    for _ in range(len(lines)):
-        wrapped.extend(wrap(lines.pop(0), conf.terminal_width) or [''])
+    for line in lines:
+        wrapped.extend(_wrapper.wrap(line) or [''])
 
     body = '\n'.join(wrapped)
     return header + body
 
 
+def _getch():
+    """Read one character without waiting for enter."""
+    if getwch:
+        ch = getwch()
+        if ch == '\x03':
+            raise KeyboardInterrupt
+        # ctrl-z ends input on windows
+        if ch == '\x1a':
+            raise EOFError
+        return ch
+    fd = sys.stdin.fileno()
+    old = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        ch = sys.stdin.read(1)
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old)
+    # ctrl-d arrives as a character once line editing is off
+    if ch == '\x04':
+        raise EOFError
+    return ch
+
+
+def read_choice(prompt: str, instant=''):
+    """Read a line of input, returning early on any key in `instant`.
+
+    Falls back to plain `input` when stdin is not an interactive terminal.
+
+    """
+
+    if not (instant and sys.stdin.isatty() and (getwch or termios)):
+        return input(prompt).strip()
+
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    ch = _getch()
+    if not ch:
+        raise EOFError
+    elif ch in instant:
+        print(ch)
+        return ch
+    elif ch in '\r\n':
+        print()
+        return ''
+    # finish reading the line normally
+    sys.stdout.write(ch)
+    sys.stdout.flush()
+    return (ch + input()).strip()
+
+
 class Printer:
     """Print nodes form mutable list."""
 
@@ -58,6 +150,10 @@ menu_log.addHandler(NullHandler())
 class Menu:
     """Navigate user through menus."""
 
+    # menus are referenced weakly by their children
+    __slots__ = ('name', '_parent', 'doc', '_option_names', '_option_actions', '_render',
+                 '__weakref__')
+
     def __init__(self, name: str, parent=None, *, doc=None):
         """Initialize menu."""
 
@@ -67,10 +163,14 @@ class Menu:
         self.name = name
         self._parent = ref(parent) if parent else ref(self)
         self.doc = doc
-        self._options = []  # type: list[Option]
+        # options are stored as parallel lists of names and actions
+        self._option_names = []  # type: list[str]
+        self._option_actions = []
+        # rendered menu text, rebuilt when stale
+        self._render = None  # type: tuple[tuple, str]
 
     def __iter__(self):
-        return iter(self._options)
+        return map(Option._make, zip(self._option_names, self._option_actions))
 
     def add_menu(self, menu, *, doc=None):
         """Register option that points to a menu.
@@ -89,7 +189,9 @@ class Menu:
             menu = self.__class__(menu, self, doc=doc+'\n'*2)
         else:
             raise TypeError('menu %r is not Menu or string' % menu)
-        self._options.append(Option(menu.name, menu))
+        self._option_names.append(menu.name)
+        self._option_actions.append(menu)
+        self._render = None
         return menu
 
     def add_func(self, name: str, func=None):
@@ -104,7 +206,9 @@ class Menu:
             func = self._place_holder
         if not callable(func):
             raise TypeError('function %r not callable' % func)
-        self._options.append(Option(name, _Func(func)))
+        self._option_names.append(name)
+        self._option_actions.append(_Func(func))
+        self._render = None
         return func
 
     def prompt(self):
@@ -121,26 +225,20 @@ class Menu:
 
         clear()
 
-        print(self.name)
-        print(conf.menu_name_char * len(self.name))
-        print()  # add line between menu name and items
-
-        # print doc info if possible
-        if self.doc:
-            print(form_doc(self.doc))
-
-        for i, opt in enumerate(self._options):
-            print(' %s: %s' % (i, opt.name))
-
-        print()  # add line between items and input
-        r = input('> ').strip()
+        # the rendered menu depends on these settings
+        key = self.name, self.doc, conf.menu_name_char, conf.terminal_width
+        if self._render is None or self._render[0] != key:
+            self._render = key, self._build_render()
+        sys.stdout.write(self._render[1])
+        # single digit selections do not need enter
+        r = read_choice('> ', '0123456789' if len(self._option_names) <= 10 else '')
         if r == 'b':
             return self._parent()
         elif r == 'q':
             raise StopException('exit menu command')
         elif r == 'h' or r == 'help':
             clear()
-            print(form_doc(self.prompt.__doc__))
+            sys.stdout.write(form_doc(self.prompt.__doc__) + '\n')
             input('Press enter to continue.')  # wait for the user to read
 
         # convert response
@@ -155,11 +253,21 @@ class Menu:
 
         # select action
         try:
-            return self._options[r].action
+            return self._option_actions[r]
         except IndexError:
             # default to self
             return self
 
+    def _build_render(self):
+        """Render the menu, with blank lines between sections."""
+
+        parts = ['%s\n%s\n' % (self.name, conf.menu_name_char * len(self.name)), '\n']
+        if self.doc:
+            parts.append(form_doc(self.doc) + '\n')
+        parts.extend(' %s: %s\n' % (i, name) for i, name in enumerate(self._option_names))
+        parts.append('\n')
+        return ''.join(parts)
+
     # prompt on call
     def __call__(self):
         return self.prompt()
@@ -170,6 +278,8 @@ class Menu:
 
 
 class _Func:
+    __slots__ = ('_func', '_args', '_kwargs')
+
     def __init__(self, func, *args, **kwargs):
         if not callable(func):
             raise TypeError('function %r not callable' % func)
@@ -181,5 +291,5 @@ class _Func:
         clear()
         # print help information
         if self._func.__doc__:
-            print(form_doc(self._func.__doc__))
+            sys.stdout.write(form_doc(self._func.__doc__) + '\n')
         return self._func(*self._args, **self._kwargs)
@@ -1,3 +1,4 @@
+import atexit
 from core.ld import EasyConfig
 from typing import List
 
@@ -99,10 +100,14 @@ class Conf(EasyConfig):
 conf = Conf()
 
 
+# write out any changes still waiting on a scheduled dump
+atexit.register(conf.flush)
+
+
 def dump_after(f):
     def g(*args, **kwargs):
         f(*args, **kwargs)
-        conf.dump()
+        conf.schedule_dump()
     # preserve name and doc of function
     g.__name__ = f.__name__
     g.__doc__ = f.__doc__
@@ -2,8 +2,10 @@
 
 from logging import getLogger
 from io import RawIOBase, TextIOWrapper
-from threading import Lock
+from threading import Lock, Timer
 import json
+import os
+from struct import Struct
 from pathlib import Path
 
 
@@ -14,6 +16,14 @@ __copyright__ = 'GNU General Public License V3'
 log = getLogger(__name__)
 
 
+# length prefixes used by linear dictionaries
+_LEN2 = Struct('<H')
+_LEN4 = Struct('<I')
+_LEN8 = Struct('<Q')
+# bytes collected before each linear dictionary write
+DUMP_BLOCK = 64 * 1024
+
+
 class Error(Exception):
     pass
 
@@ -43,29 +53,74 @@ class JSONDict:
 
 
 class EasyConfig:
-    def __init__(self, name='conf.json', defaults: dict = None):
+    def __init__(self, name='conf.json', defaults: dict = None, *, delay=0.2):
+        self._name = str(name)
         if not Path(name).exists():
             with Path(name).open('w') as file:
                 json.dump({}, file)
-        self._file = open(name, 'r+')
-        self._json = JSONDict(self._file, defaults)
+        self._d = defaults or {}
+
+        # pending dump tracking
+        self._delay = delay
+        self._dirty = False
+        self._timer = None
+        self._timer_lock = Lock()
+
         if defaults:
-            self._json.default_update()
+            self._d.update(self._read())
             self.dump()
 
     @property
     def dict(self):
-        return self._json.dict
+        return self._d
+
+    def _read(self):
+        with open(self._name) as file:
+            return json.load(file)
+
+    def _write(self, **kwargs):
+        # replace the file in one step so it is never left half written
+        tmp = self._name + '.tmp'
+        with open(tmp, 'w') as file:
+            json.dump(self._d, file, **kwargs)
+        os.replace(tmp, self._name)
 
     def dump(self):
-        self._json.dump()
-        self._file.flush()
+        self._dirty = False
+        # the config is meant to be edited by hand
+        self._write(indent=4, sort_keys=True)
+
+    def schedule_dump(self):
+        """Mark the config as changed and dump it after a short delay.
+
+        Changes made before the delay runs out are written together.
+
+        """
+
+        with self._timer_lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = Timer(self._delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Dump the config if it has unsaved changes."""
+        with self._timer_lock:
+            self._timer = None
+            if self._dirty:
+                self.dump()
 
     def load(self):
-        return self._json.load()
+        d = self._read()
+        self._d.clear()
+        self._d.update(d)
 
     def close(self):
-        self._file.close()
+        with self._timer_lock:
+            if self._timer:
+                self._timer.cancel()
+        self.flush()
 
 
 class LoaderError(Error):
@@ -126,18 +181,24 @@ class LinearDict:
         i = 0
         with self._lock:
             # dump dictionary length
-            self._file.write(len(self._d).to_bytes(8, 'little'))
+            buf = bytearray(_LEN8.pack(len(self._d)))
             for k, v in self._d.items():
                 i += 1
                 # dump key
-                self._file.write(len(k).to_bytes(2, 'little'))
-                self._file.write(k)
+                buf += _LEN2.pack(len(k))
+                buf += k
                 # dump value
-                self._file.write(len(v).to_bytes(4, 'little'))
-                self._file.write(v)
+                buf += _LEN4.pack(len(v))
+                buf += v
+                # write out in large blocks
+                if len(buf) >= DUMP_BLOCK:
+                    self._file.write(buf)
+                    buf.clear()
                 # return progress
                 log.debug('linear dumped {0}:{1}'.format(k[:4], v[:4]))
                 yield i
+            if buf:
+                self._file.write(buf)
         log.info('finished dumping %r' % self)
 
     def load(self):
@@ -148,25 +209,34 @@ class LinearDict:
         progress(self.iter_load(), self.get_length(), name)
 
     def iter_load(self):
-        # prepare read location
-        self.get_length()
+        # read the whole file once and parse entries by offset
+        self._file.seek(0)
+        data = memoryview(self._file.read() or b'')
+        end = len(data)
+        pos = 8  # skip dictionary length
         self._d.clear()
         i = 0
-        while True:
+        while pos < end:
             i += 1
-            # check for end of file
-            tmp = self._file.read(2)
-            if not tmp:
-                raise StopIteration
             # load key
-            k_len = int.from_bytes(tmp, 'little')
-            k = self._file.read(k_len)
+            if pos + 2 > end:
+                log.warning('performed partial load')
+                raise LoaderError('unable to read key length')
+            k_len, = _LEN2.unpack_from(data, pos)
+            pos += 2
+            k = bytes(data[pos:pos + k_len])
+            pos += k_len
             if len(k) != k_len:
                 log.warning('performed partial load')
                 raise LoaderError('unable to read key %s' % k)
             # load value
-            v_len = int.from_bytes(self._file.read(4), 'little')
-            v = self._file.read(v_len)
+            if pos + 4 > end:
+                log.warning('performed partial load')
+                raise LoaderError('unable to read value length for %s' % k)
+            v_len, = _LEN4.unpack_from(data, pos)
+            pos += 4
+            v = bytes(data[pos:pos + v_len])
+            pos += v_len
             if len(v) != v_len:
                 log.warning('performed partial load')
                 raise LoaderError('unable to read value for %s' % k)
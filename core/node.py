@@ -1,4 +1,5 @@
 from hashlib import sha256
+from hmac import compare_digest
 from io import RawIOBase, BufferedIOBase, BytesIO
 from core.ld import LinearDict
 
@@ -24,15 +25,25 @@ class DecodeError(NodeError):
     pass
 
 
+def _digest(flag, parent, length, msg):
+    # hash the parts in place rather than joining them first
+    h = sha256(flag)
+    h.update(parent)
+    h.update(length)
+    h.update(msg)
+    return h.digest()
+
+
 class Node:
     """Store story information for data movement."""
 
     def __init__(self, msg: str, parent: bytes = None):
         """Initialize node object."""
 
-        if len(parent) != 32:
+        if parent is not None and len(parent) != 32:
             raise ValueError('incorrect parent signature')
 
+        self._text = msg
         self._msg = msg.encode('utf-8')
         if len(self._msg) <= 2**16:
             self._len = len(self._msg).to_bytes(2, 'little')
@@ -46,10 +57,7 @@ class Node:
             self._flag = BASE
             self._parent = bytes(32)
 
-        self._sha = sha256(self._flag +
-                           self._parent +
-                           self._len +
-                           self._msg).digest()
+        self._sha = _digest(self._flag, self._parent, self._len, self._msg)
 
         self._cache = None
 
@@ -57,6 +65,12 @@ class Node:
     def msg(self) -> bytes:
         return self._msg
 
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._msg.decode('utf-8')
+        return self._text
+
     @property
     def parent(self) -> bytes:
         return self._parent if self._flag == CHILD else None
@@ -73,41 +87,55 @@ class Node:
         if self._cache:
             return self._cache
         else:
-            result = bytearray()
-
-            result.extend(self._flag)
-            result.extend(self._parent)
-            result.extend(self._len)
-            result.extend(self._msg)
-            result.extend(self._sha)
-
-            self._cache = bytes(result)
+            self._cache = b''.join((self._flag,
+                                    self._parent,
+                                    self._len,
+                                    self._msg,
+                                    self._sha))
             return self._cache
 
-    @classmethod
-    def from_bytes(cls, stream):
+    @staticmethod
+    def _read_fields(stream):
         if not isinstance(stream, (RawIOBase, BufferedIOBase)):
             stream = BytesIO(stream)
 
         flag = stream.read(1)
-        if flag == BASE:
-            stream.read(32)
-            parent = None
-        elif flag == CHILD:
-            parent = stream.read(32)
-        else:
+        if flag != BASE and flag != CHILD:
             raise DecodeError('invalid flag %r' % flag)
+        parent = stream.read(32)
 
-        length = int.from_bytes(stream.read(2), 'little')
-        if length > 2**16:
-            raise DecodeError('message size too large')
-        msg = stream.read(length)
+        length = stream.read(2)
+        msg = stream.read(int.from_bytes(length, 'little'))
 
         sha = stream.read(32)
-        if sha256(flag + parent + length + msg).digest() != sha:
-            raise DecodeError('incorrect hash')
+        return flag, parent, length, msg, sha
+
+    @classmethod
+    def _from_fields(cls, flag, parent, length, msg, sha):
+        # fields are already encoded, so skip __init__
+        node = cls.__new__(cls)
+        node._text = None
+        node._msg = msg
+        node._len = length
+        node._parent = parent
+        node._flag = flag
+        node._sha = sha
+        node._cache = None
+        return node
 
-        return cls(msg, parent)
+    @classmethod
+    def from_bytes(cls, stream, verify=True):
+        fields = cls._read_fields(stream)
+        if verify:
+            if not compare_digest(_digest(*fields[:4]), fields[4]):
+                raise DecodeError('incorrect hash')
+
+        return cls._from_fields(*fields)
+
+    @classmethod
+    def from_bytes_trusted(cls, stream):
+        """Load a node from a trusted source without verifying its hash."""
+        return cls._from_fields(*cls._read_fields(stream))
 
 
 class LinkageError(Error):
@@ -136,31 +164,43 @@ class Tree:
         else:
             raise LinkageError('parent node not in tree')
 
+    def verify_all(self):
+        """Rehash every node, returning the keys of any that do not match."""
+        return [key for key, node in self._nodes.items()
+                if not compare_digest(_digest(node._flag, node._parent, node._len, node._msg), key)]
+
     def unlink(self, node: Node):
         del self._nodes[node.sha]
 
     def retrace(self, node: Node):
-        while True:
-            parent = self._nodes[node.sha].parent
-            if parent:
-                try:
-                    node = self._nodes[parent]
-                except KeyError:
-                    raise LinkageError(
-                        'attempt to retrace broken node tree'
-                    ) from None
-                yield node
-            else:
-                break
-
-    def bind_ld(self, file):
-        return LinearDict(file, ByteDict(self))
+        nodes = self._nodes
+        parent = nodes[node.sha].parent
+        while parent:
+            try:
+                node = nodes[parent]
+            except KeyError:
+                raise LinkageError(
+                    'attempt to retrace broken node tree'
+                ) from None
+            yield node
+            parent = node.parent
+
+    def bind_ld(self, file, trusted=False):
+        """Bind the tree to a linear dictionary file.
+
+        Nodes are verified unless the file is marked `trusted`, which
+        should only be done for files written locally.
+
+        """
+
+        return LinearDict(file, ByteDict(self, trusted))
 
 
 class ByteDict(dict):
-    def __init__(self, tree: Tree):
+    def __init__(self, tree: Tree, trusted=False):
         super().__init__()
         self._nodes = tree.nodes
+        self._load = Node.from_bytes_trusted if trusted else Node.from_bytes
 
     def clear(self):
         self._nodes.clear()
@@ -169,11 +209,19 @@ class ByteDict(dict):
         return self._nodes[key].to_bytes()
 
     def __setitem__(self, key, value):
-        self._nodes[key] = Node.from_bytes(value)
+        # rewriting a node with its own bytes changes nothing
+        existing = self._nodes.get(key)
+        if existing is not None and existing.to_bytes() == value:
+            return
+        self._nodes[key] = self._load(value)
 
     def __iter__(self):
         return iter(self._nodes)
 
+    def __len__(self):
+        return len(self._nodes)
+
     def items(self):
-        for key in self:
-            yield key, self[key]
+        # walk the tree dict directly instead of looking each key up again
+        for key, node in self._nodes.items():
+            yield key, node.to_bytes()
@@ -37,6 +37,11 @@ class NodeHandler:
         self.database[node.sha] = save
         self.cache[node.sha] = node
 
+    def bulk_add(self, nodes):
+        """Add each of several nodes to the current database."""
+        for node in nodes:
+            self.add(node)
+
     def remove(self, location: bytes):
         try:
             self.unload(location)
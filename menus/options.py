@@ -71,7 +71,7 @@ def clear_len():
     """Control number of lines to scroll on clear.
 
     Note:
-        This option only has an effect if Clear Menu is enabled.
+        This option only has an effect if Clear Menu is enabled and the terminal cannot be cleared directly.
 
     """
 
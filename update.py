@@ -1,8 +1,11 @@
 import json
 import threading
+import atexit
 from time import sleep
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from tarfile import open as tar
-from tempfile import TemporaryFile
 from binascii import hexlify
 from requests import get
 from hashlib import sha256
@@ -14,9 +17,17 @@ class Error(Exception):
 
 
 class JsonHook:
-    def __init__(self, name: str, default: dict = None, *, indent=4):
+    def __init__(self, name: str, default: dict = None, *, indent=4, delay=0.1):
         self._name = name
         self._indent = indent
+
+        # pending dump tracking
+        self._delay = delay
+        self._dirty = False
+        self._timer = None
+        self._timer_lock = threading.Lock()
+        atexit.register(self.flush)
+
         self._existed = Path(name).exists()
         if self._existed:
             with open(name) as file:
@@ -26,21 +37,38 @@ class JsonHook:
             self.dump()
 
     def dump(self):
+        self._dirty = False
         with open(self._name, 'w') as file:
             json.dump(self._json, file,
                       indent=self._indent,
                       sort_keys=True)
 
+    def schedule_dump(self):
+        """Dump after a short delay so that several changes are written together."""
+        with self._timer_lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self._delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Dump if there are unsaved changes."""
+        with self._timer_lock:
+            self._timer = None
+            if self._dirty:
+                self.dump()
+
     def __delitem__(self, key):
         del self._json[key]
-        self.dump()
+        self.schedule_dump()
 
     def __getitem__(self, key):
         return self._json[key]
 
     def __setitem__(self, key, value):
         self._json[key] = value
-        self.dump()
+        self.schedule_dump()
 
 
 v = JsonHook('version.json', {
@@ -49,6 +77,12 @@ v = JsonHook('version.json', {
 })
 
 
+# bytes read per download chunk
+CHUNK_SIZE = 64 * 1024
+# files read ahead of the one being hashed
+READ_AHEAD = 8
+
+
 class Feed:
     def __init__(self, pattern: str, end='\r'):
         self.pattern = pattern
@@ -84,18 +118,35 @@ def calculate_hash(force=False, lines: Counter = 0, chars: Counter = 0):
     if v['current'] and not force:
         return v['current']
 
-    py_files = {str(p): p for p in Path().rglob('*.py')}
+    paths = sorted(Path().rglob('*.py'), key=str)
     sha = sha256()
     display = Feed('Hashing %s')
-    for path in sorted(py_files):
-        with py_files[path].open('rb') as file:
+    n_lines = n_chars = 0
+    # read files ahead on a pool while hashing them in order,
+    # so the digest matches a sequential hash of the same files
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # submit one new read as each file is consumed to bound memory
+        pending = iter(paths)
+        ahead = deque((path, pool.submit(path.read_bytes))
+                      for path in islice(pending, READ_AHEAD))
+        while ahead:
+            path, future = ahead.popleft()
+            following = next(pending, None)
+            if following is not None:
+                ahead.append((following, pool.submit(following.read_bytes)))
+            data = future.result()
             display.print(path)
             sleep(wait)
-            for line in file:
-                lines += 1
-                chars += len(line)
-                sha.update(line)
+            sha.update(data)
+            n_chars += len(data)
+            n_lines += data.count(b'\n')
+            # count a last line that has no newline
+            if data and not data.endswith(b'\n'):
+                n_lines += 1
     display.close('Finished hash.')
+    # update the shared counters once
+    lines += n_lines
+    chars += n_chars
     h = hexlify(sha.digest()).decode('utf-8')
     v['current'] = h
     return h
@@ -110,8 +161,14 @@ def grab_version(latest=False):
               '/p2pg/version.json'
     print('Getting version information...')
     wheel.start()
-    result = get(url).json()
-    wheel.stop()
+    # parse the body as it is read instead of buffering it as text first
+    response = get(url, stream=True)
+    response.raw.decode_content = True
+    try:
+        result = json.load(response.raw)
+    finally:
+        response.close()
+        wheel.stop()
     return result
 
 
@@ -120,29 +177,32 @@ class Wheel:
         self.before = None
         self.speed = None
         self.clockwise = None
-        self._state_lock = threading.Lock()
-        self._state = False
+        # set while the wheel should not spin
+        self._stopped = threading.Event()
+        self._stopped.set()
         self._thread = None
 
     @property
     def state(self):
-        with self._state_lock:
-            return self._state
+        return not self._stopped.is_set()
 
     @state.setter
     def state(self, value):
-        with self._state_lock:
-            self._state = bool(value)
+        if value:
+            self._stopped.clear()
+        else:
+            self._stopped.set()
 
     def loop(self):
         place = 0
         frames = ('-', '\\', '|', '/')
         direction = 1 if self.clockwise else -1
-        while self.state:
+        # wake up as soon as the wheel is stopped
+        while not self._stopped.is_set():
             print(self.before + frames[place], end='\r')
             place += direction
             place %= len(frames)
-            sleep(1 / self.speed)
+            self._stopped.wait(1 / self.speed)
         print(' ' * (len(self.before) + 1), end='\r')
 
     def start(self, before='   ', speed=4, clockwise=True):
@@ -169,69 +229,81 @@ class Wheel:
             self._thread = None
 
 
-def download_version(version: str = None, v_info=None, chunk_size=128):
-    version = version or v['get-version']
-    if version == 'latest':
-        v_info = v_info or grab_version(True)
-        n_sig = v_info['current']
-        url = 'https://github.com/Tankobot' \
-              '/p2pg/archive/master.tar.gz'
-    else:
-        v_info = v_info or grab_version()
-        n_sig = v_info[version][0]
-        url = v_info[version][1]
-    if v['current'] != n_sig:
-        print('latest: %s' % n_sig)
-        print('Downloading version (%s)' % version)
-        wheel.start()
-        new_version = get(url, stream=True)
-        file = TemporaryFile(buffering=0)
-
-        # handle if the file length can't be retrieved
-        try:
-            total = int(new_version.headers['content-length'])
-        except KeyError:
-            total = 0
+class CountingReader:
+    """Count the bytes read from a stream."""
 
-        place = 0
-        wheel.stop()
-        if not total:
-            wheel.start('Downloading... ')
+    def __init__(self, raw, total=0):
+        self._raw = raw
+        self.total = total
+        self.place = 0
 
-        for chunk in new_version.iter_content(chunk_size):
-            file.write(chunk)
-            place += len(chunk)
-            if total:
-                percentage = str(round(place/total * 100, 1)).rjust(5)
-                print('Downloading... %s' % percentage, end='\r')
+    def read(self, n=-1):
+        data = self._raw.read(n)
+        self.place += len(data)
+        return data
 
-        wheel.stop()
-        print('Finished downloading.')
-        file.seek(0)
-        return file, n_sig
+    @property
+    def percentage(self):
+        # decoded content can run past the reported length
+        return min(round(self.place/self.total * 100, 1), 100.0)
 
 
-def remove_folder(tar_file):
+def remove_folder(tar_file, progress: CountingReader = None):
     tar_info = tar_file.next()
-    display = Feed('Extracting %s')
+    if progress and progress.total:
+        display = Feed('Downloading... %5s Extracting %s')
+    else:
+        progress = None
+        display = Feed('Extracting %s')
+    # archives keep everything under one top folder
+    prefix = tar_info.name.partition('/')[0] + '/' if tar_info else ''
+    cut = len(prefix)
     while tar_info:
-        tar_info.name = tar_info.name.partition('/')[2]
+        name = tar_info.name
+        if name.startswith(prefix):
+            tar_info.name = name[cut:]
+        else:
+            tar_info.name = name.partition('/')[2]
         if tar_info.name:
-            display.print(tar_info.name)
+            if progress:
+                display.print((progress.percentage, tar_info.name))
+            else:
+                display.print(tar_info.name)
             sleep(wait)
             yield tar_info
         tar_info = tar_file.next()
     display.close('Finished extraction.')
 
 
-def install(version: str, v_info=None, chunk_size=None):
-    archive, n_sig = download_version(version, v_info, chunk_size)
-    print('Installing (%s)...' % version)
+def install(version: str, v_info=None, chunk_size=CHUNK_SIZE):
+    version = version or v['get-version']
+    if version == 'latest':
+        v_info = v_info or grab_version(True)
+        n_sig = v_info['current']
+        url = 'https://github.com/Tankobot' \
+              '/p2pg/archive/master.tar.gz'
+    else:
+        v_info = v_info or grab_version()
+        n_sig = v_info[version][0]
+        url = v_info[version][1]
+    print('latest: %s' % n_sig)
+    print('Downloading and installing (%s)...' % version)
+    # extract while the archive is still arriving
+    response = get(url, stream=True)
+    response.raw.decode_content = True
+
+    # handle if the file length can't be retrieved
+    try:
+        total = int(response.headers['content-length'])
+    except KeyError:
+        total = 0
+    archive = CountingReader(response.raw, total)
+
     try:
-        with tar(mode='r:gz', fileobj=archive) as file:
-            file.extractall(members=remove_folder(file))
+        with tar(mode='r|gz', fileobj=archive, bufsize=chunk_size) as file:
+            file.extractall(members=remove_folder(file, archive))
     finally:
-        archive.close()
+        response.close()
     print('Verifying installation...')
     _sha = calculate_hash(True)
     print('   sha: %s' % _sha)
@@ -251,7 +323,7 @@ def main():
     parser.add_argument('-j', '--just-hash', dest='just_hash',
                         action='store_true', help='only display/write hash')
     parser.add_argument('-c', '--chunk', dest='chunk_size',
-                        metavar='INT',
+                        metavar='INT', default=CHUNK_SIZE,
                         type=int, help='chunk key_size')
     parser.add_argument('-w', '--wait', dest='wait',
                         default=0, type=float,
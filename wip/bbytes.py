@@ -1,3 +1,8 @@
+# translate between ascii binary digits and raw bit values
+_TO_BITS = bytes.maketrans(b'01', b'\x00\x01')
+_FROM_BITS = bytes.maketrans(b'\x00\x01', b'01')
+
+
 class Byte(int):
     def __new__(cls, *args, **kwargs):
         self = super().__new__(cls, *args, **kwargs)
@@ -7,8 +12,7 @@ class Byte(int):
 
     def __getitem__(self, item):
         # reverse endian
-        pos = 7 - item
-        return 1 if (self // 2**pos) % 2 else 0
+        return (self >> (7 - item)) & 1
 
     def __repr__(self):
         return '%s(%s)' % (self.__class__.__name__,
@@ -28,26 +32,48 @@ class ByteArray(bytearray):
         else:
             return super().__getitem__(item)
 
-    def bit(self, n: int, v: int = None):
-        byte = n // 8
-        carry = n - byte
-        if v:
-            self[byte, carry] = v
-        else:
+    def bit(self, n, v: int = None):
+        if isinstance(n, slice):
+            # bulk access through the unpacked bits
+            if v is None:
+                return self.as_bits()[n]
+            bits = bytearray(self.as_bits())
+            bits[n] = v
+            self[:] = self.from_bits(bits)
+            return
+        byte, carry = divmod(n, 8)
+        if v is None:
             return self[byte, carry]
+        else:
+            self[byte, carry] = v
+
+    def as_bits(self) -> bytes:
+        """Unpack every bit into its own byte, most significant bit first."""
+        if not self:
+            return b''
+        digits = bin(int.from_bytes(self, 'big'))[2:].zfill(len(self) * 8)
+        return digits.encode('ascii').translate(_TO_BITS)
+
+    @classmethod
+    def from_bits(cls, bits):
+        """Pack a sequence of 0 and 1 values back into bytes."""
+        bits = bytes(bits)
+        if len(bits) % 8:
+            raise ValueError('number of bits must be a multiple of eight')
+        if not bits:
+            return cls()
+        return cls(int(bits.translate(_FROM_BITS), 2).to_bytes(len(bits) // 8, 'big'))
 
     def __setitem__(self, key, value):
         if isinstance(key, tuple):
             # single bit
-            byte = self[key[0]]
+            byte = super().__getitem__(key[0])
             # reverse endian
-            pos = 7 - key[1]
-            place = 2**pos
-            bit = (byte // place) % 2
+            mask = 1 << (7 - key[1])
             if value == 1:
-                byte += 0 if bit else place
+                byte |= mask
             elif value == 0:
-                byte -= place if bit else 0
+                byte &= ~mask
             else:
                 raise ValueError('attempt to assign non 1 or 0')
             super().__setitem__(key[0], byte)
@@ -1,46 +1,28 @@
-import threading
 import logging
-from io import BufferedIOBase
+from concurrent.futures import ThreadPoolExecutor
+from io import BufferedIOBase, BufferedRandom
 from weakref import ref
-from math import isinf
+from math import ceil, isinf
 import abc
 
 
+# shared workers for asynchronous calls
+_pool = ThreadPoolExecutor(max_workers=4)
+
+
 class AsynchronousCall:
     def __init__(self, target, *args, **kwargs):
-        self._lock = threading.Lock()
-        self._result = ()
-        self._thread = threading.Thread(target=self.catch(target),
-                                        args=args,
-                                        kwargs=kwargs)
-        self._thread.daemon = True
-        self._thread.start()
+        self._future = _pool.submit(target, *args, **kwargs)
 
     NotDone = type('NotDoneType', (), {
         '__bool__': lambda self: False,
         '__repr__': lambda self: 'NotDone'
     })()
 
-    def catch(self, target):
-        def f(*args, **kwargs):
-            result = target(*args, **kwargs)
-            with self._lock:
-                self._result = result
-        return f
-
-    @property
-    def daemon(self):
-        return self._thread.daemon
-
-    @daemon.setter
-    def daemon(self, value):
-        self._thread.daemon = value
-
     def __call__(self):
-        if self._thread.is_alive():
+        if not self._future.done():
             return self.NotDone
-        with self._lock:
-            return self._result
+        return self._future.result()
 
 
 class DBError(Exception):
@@ -50,16 +32,21 @@ class DBError(Exception):
 logger = logging.getLogger(__name__)
 
 
-def db_open(name: str, size: int):
-    """Setup a HDDB."""
+def db_open(name: str, size: int, buffer_size=64 * 1024):
+    """Setup a HDDB.
+
+    Small section writes are collected in a buffer of `buffer_size` bytes.
+
+    """
 
     # try to open file
     try:
         logger.info('HDDB %s opened', name)
-        file = open(name, 'r+b')
+        raw = open(name, 'r+b', buffering=0)
     except FileNotFoundError:
         logger.info('HDDB %s created', name)
-        file = open(name, 'w+b')
+        raw = open(name, 'w+b', buffering=0)
+    file = BufferedRandom(raw, buffer_size)
     if not file.seekable():
         logger.critical('HDDB %s is not seekable', name)
         raise DBError('HDDB %s is not seekable' % name)
@@ -79,22 +66,38 @@ class HighDensityDB:
 
     def __init__(self, file_obj, step=256, key_size=5):
         assert isinstance(file_obj, BufferedIOBase), 'file_obj must support BufferedIOBase'
-        assert key_size*256 % step, 'key_size not divisible by step'
+        assert not key_size*256 % step, 'key_size not divisible by step'
 
         self.file = file_obj
+        # track the file size instead of seeking to the end on each use
+        self.file.seek(0, 2)
+        self._size_cache = self.file.tell()
 
         self._step = step
         self._jumps = key_size*256 // step
         # default key size enables up to 1TB HDDB
         self._key_size = key_size
+        # written out for every new index
+        self._blank_index = bytes(key_size * step)
         self._status = 1
         self._root = _Index(self, 0)
         self._item = None
 
+        # specialize index traversal for the default layout
+        if (step, key_size) == (256, 5):
+            self._walk = self._walk_256_5
+        else:
+            self._walk = self._walk_index
+
     @property
     def size(self):
-        self.file.seek(0, 2)
-        return self.file.tell()
+        return self._size_cache
+
+    def _track(self):
+        """Grow the cached size if the last write went past the end."""
+        end = self.file.tell()
+        if end > self._size_cache:
+            self._size_cache = end
 
     @property
     def step(self):
@@ -129,7 +132,8 @@ class HighDensityDB:
         if s is None:
             return sections[int.from_bytes(self.file.read(1), 'little')]
         else:
-            self.file.write(r_sections[s])
+            self.file.write(bytes((r_sections[s],)))
+            self._track()
 
     @property
     def item(self) -> Section:
@@ -139,6 +143,7 @@ class HighDensityDB:
     def item(self, value):
         if self.item is not value:
             self.item.finalize()
+            self.file.flush()
             self._item = value
 
     def load_item(self):
@@ -153,12 +158,36 @@ class HighDensityDB:
     def __getitem__(self, key: bytes):
         if len(key) != self.key_size:
             raise ValueError('incorrect key size')
+        return self._walk(key)
+
+    def _walk_256_5(self, key: bytes):
+        """Follow index pointers directly for five byte keys."""
+
+        file = self.file
+        seek, read = file.seek, file.read
+        pos = self._root._pos
+
+        for i in key[:-1]:
+            seek(pos + 5*i)
+            next_pos = int.from_bytes(read(5), 'little')
+            if not next_pos:
+                raise KeyError('unset index')
+            seek(next_pos)
+            if read(1) != _INDEX_MARK:
+                # leave anything unusual to the general walk
+                return self._walk_index(key)
+            pos = next_pos + 1
+
+        return _Index(self, pos)
+
+    def _walk_index(self, key: bytes):
         item = self._root
+        seek = self.file.seek
 
         for i in key[:-1]:
             pos = item[i]
             if pos:
-                self.file.seek(pos)
+                seek(pos)
                 item = self.load_item()
             else:
                 item[i] = self.size
@@ -167,9 +196,11 @@ class HighDensityDB:
         return item
 
     def remap(self, name: str, chunk_size=1024):
+        # the cached size is stale once remapping is implemented
         return NotImplemented
 
     def close(self):
+        self.file.flush()
         self.file.close()
 
     def __exit__(self, *args):
@@ -182,6 +213,7 @@ sections = [
     'data'
 ]
 r_sections = {v: i for i, v in enumerate(sections)}
+_INDEX_MARK = bytes([r_sections['index']])
 
 
 class Section(abc.ABC):
@@ -197,7 +229,10 @@ class _Index(Section):
         """Initialize index handler."""
 
         self._db = ref(db)
-        self._file = ref(db.file)
+        self._file = db.file
+        # cached for the hot paths
+        self._key_size = db.key_size
+        self._step = db.step
         self._pos = pos
 
     def finalize(self):
@@ -205,7 +240,9 @@ class _Index(Section):
 
     def blank(self):
         self.seek(0)
-        self.file.write(b'\0' * self.db.key_size * self.db.step)
+        db = self.db
+        self._file.write(db._blank_index)
+        db._track()
 
     @property
     def db(self) -> HighDensityDB:
@@ -213,31 +250,32 @@ class _Index(Section):
 
     @property
     def file(self) -> BufferedIOBase:
-        return self._file()
+        return self._file
 
     @property
     def size(self):
-        return self.db.key_size * self.db.step
+        return self._key_size * self._step
 
     def seek(self, key: int):
-        if key > self.db.step:
+        if key > self._step:
             raise ValueError('key out of index')
-        offset = self.db.key_size * key
-        self.file.seek(self._pos + offset)
+        offset = self._key_size * key
+        self._file.seek(self._pos + offset)
 
     def __getitem__(self, key: int):
         self.seek(key)
-        next_pos = self.file.read(self.db.key_size)
+        next_pos = self._file.read(self._key_size)
         next_pos = int.from_bytes(next_pos, 'little')
         if not next_pos:
             raise KeyError('unset index')
         return next_pos
 
     def __setitem__(self, key: int, value: bytes):
-        if len(value) != self.db.key_size:
+        if len(value) != self._key_size:
             raise ValueError('incorrect byte length')
         self.seek(key)
-        self.file.write(value)
+        self._file.write(value)
+        self.db._track()
 
 
 class _Data(Section):
@@ -247,10 +285,12 @@ class _Data(Section):
         """Initialize data handler."""
 
         self._db = ref(db)
-        self._file = ref(db.file)
+        self._file = db.file
+        # cached for the hot paths
+        self._key_size = db.key_size
         self._pos = pos
         self._cursor = pos
-        if limit is not None and limit <= self.db.key_size * 2:
+        if limit is not None and limit <= self._key_size * 2:
             raise ValueError('limit too small')
         self._size = limit or 0
         self._limit = limit or float('inf')
@@ -260,10 +300,13 @@ class _Data(Section):
             self._next = None
 
     def finalize(self):
-        if isinf(self._limit):
-            self._limit = self._size + 2*self.db.key_size
-        elif self._next:
-            self.next.finalize()
+        # only the last section of a chain can be unbounded
+        section = self
+        while section is not None:
+            if isinf(section._limit):
+                section._limit = section._size + 2*self._key_size
+                break
+            section = section._next
 
     @property
     def db(self) -> HighDensityDB:
@@ -271,7 +314,7 @@ class _Data(Section):
 
     @property
     def file(self) -> BufferedIOBase:
-        return self._file()
+        return self._file
 
     @property
     def next(self):
@@ -284,7 +327,7 @@ class _Data(Section):
     def _find_next(self):
         # grab pointer
         self.seek(self.limit)
-        place = self.file.read(self.db.key_size)
+        place = self._file.read(self._key_size)
         place = int.from_bytes(place, 'little')
 
         # handle no pointer
@@ -292,13 +335,13 @@ class _Data(Section):
             raise DBError('file does not have extension')
 
         # ensure the section is type Data
-        self.file.seek(place)
+        self._file.seek(place)
         m = self.db.mark()
         if m != 'data':
             raise TypeError('found non data object at next')
         else:
             # set up the next section
-            size = int.from_bytes(self.file.read(self.db.key_size), 'little')
+            size = int.from_bytes(self._file.read(self._key_size), 'little')
             return self.__class__(self.db, place + 1, size)
 
     @property
@@ -306,15 +349,17 @@ class _Data(Section):
         """Calculate length of Data chain."""
         return self._count()
 
-    def _count(self, n=0):
-        if self._next:
-            return self._count(n + 1)
-        else:
-            return n
+    def _count(self):
+        n = 0
+        section = self._next
+        while section is not None:
+            n += 1
+            section = section._next
+        return n
 
     @property
     def limit(self):
-        return self._limit - 2*self.db.key_size
+        return self._limit - 2*self._key_size
 
     def tell(self):
         return self._cursor
@@ -324,7 +369,7 @@ class _Data(Section):
 
         if offset < self.limit:
             # prevent over seek extending limited file
-            self.file.seek(self._pos + self.db.key_size + offset)
+            self._file.seek(self._pos + self._key_size + offset)
         else:
             # pass extra offset onto the next section
             self.next.seek(offset - self._size)
@@ -337,75 +382,92 @@ class _Data(Section):
         self.seek(self.tell())
 
     def write(self, data: bytes):
-        # seek to cursor
-        self.refresh()
-
-        # pass data to next section if cursor is too far forward
-        if self.tell() >= self.limit:
-            return self.next.write(data)
-
-        cut = self.limit - self.tell()
-        if len(data) <= cut:
-            # write data to current section
-            self.file.write(data)
-        else:
-            # handle too much data for current section
-            self.file.write(data[:cut])
-            self.next.write(data[cut:])
+        # slice without copying when data spans sections
+        data = memoryview(data)
+        file = self._file
+        db = self.db
+
+        moved = []
+        section = self
+        while section is not None:
+            # seek to cursor
+            section.refresh()
+
+            # pass data to next section if cursor is too far forward
+            if section.tell() >= section.limit:
+                section = section.next
+                continue
+
+            moved.append((section, section.tell() + len(data)))
+            cut = section.limit - section.tell()
+            if len(data) <= cut:
+                # write data to current section
+                file.write(data)
+                section = None
+            else:
+                # handle too much data for current section
+                file.write(data[:cut])
+                data = data[cut:]
+                section = section.next
+            db._track()
 
-        # move cursor forward
-        self.seek(self.tell() + len(data))
+        # move cursors forward, last section first
+        for section, offset in reversed(moved):
+            section.seek(offset)
 
     def read(self, n=0):
         assert n >= 0, 'n cannot be negative'
+        file = self._file
+
+        chunks = []
+        section = self
+        while section is not None:
+            # seek to cursor
+            section.refresh()
+
+            cut = section._size - section.tell()
+            if n and n <= cut:
+                # remaining read fits in this section
+                chunks.append(file.read(n))
+                break
 
-        # seek to cursor
-        self.refresh()
-
-        cut = self._size - self.tell()
-
-        # handle custom read length
-        if n:
-            if n <= cut:
-                # perform read
-                return self.file.read(min(n, cut))
-            else:
-                # attempt to split read
-                data = self.file.read(cut)
-                if self._next:
-                    data += self.next.read(n - cut)
-                return data
-
-        # read rest of file
-        else:
-            if self._next:
-                # split read
-                return self.file.read(cut) + self.next.read()
-            else:
-                # perform read
-                return self.file.read(self._size - self.tell())
+            # read the rest of this section and continue in the next
+            chunks.append(file.read(cut))
+            if n:
+                n -= cut
+            section = section._next
+        return b''.join(chunks)
 
     def extend(self):
         # create pointer to next section
         assert not isinf(self.limit), 'cannot extend infinite limit'
         self.seek(self.limit)
-        place = self.db.size.to_bytes(self.db.key_size, 'little')
-        self.file.write(place)
+        end = self.db.size
+        self._file.write(end.to_bytes(self._key_size, 'little'))
+        self.db._track()
 
         # set up the next section
-        self.file.seek(self.db.size)
+        self._file.seek(end)
         self.db.mark('data')
-        return self.__class__(self.db, place + 1)
+        return self.__class__(self.db, end + 1)
 
     def close(self):
+        file = self._file
+        key_size = self._key_size
+
         # handle extended Data
-        if self._next:
-            self._next.close()
+        chain = []
+        section = self
+        while section is not None:
+            chain.append(section)
+            section = section._next
 
-        # record current section size
-        self.seek(-self.db.key_size)
-        size = self._size.to_bytes(self.db.key_size, 'little')
-        self.file.write(size)
+        # record section sizes, last section first
+        for section in reversed(chain):
+            section.seek(-key_size)
+            file.write(section._size.to_bytes(key_size, 'little'))
+            section.db._track()
+        file.flush()
 
 
 def test_hash(f, c=1000, r=(0, 1), space=False, x=20, y=60):
@@ -416,19 +478,15 @@ def test_hash(f, c=1000, r=(0, 1), space=False, x=20, y=60):
     """
 
     step = r[1] / x
-    hist = [0 for _ in range(x)]
+    hist = [0] * x
     for i in range(c):
         e = f(i) % r[1]
-        for j in range(x):
-            if e <= step*(j + 1):
-                hist[j] += 1
-                break
+        # bucket j holds values in (step*j, step*(j + 1)]
+        j = max(ceil(e / step) - 1, 0)
+        if j < x:
+            hist[j] += 1
     m = r[1] if space else max(hist)
-    for i, v in enumerate(hist):
-        hist[i] = '-' * round(v / m * y)
-    for line in hist:
-        assert isinstance(line, str)
-        print(line + ' '*(y - len(line)) + '|')
+    print('\n'.join(('-' * round(v / m * y)).ljust(y) + '|' for v in hist))
 
 
 def test_map(key_map: KeyMap, mod: int, space=False):
@@ -1,6 +1,11 @@
 from hashlib import sha256
-from io import BufferedIOBase
-from math import log2
+from io import BufferedIOBase, UnsupportedOperation
+from mmap import mmap
+from struct import Struct
+
+
+# object sizes are stored as unsigned 64 bit ints
+_U64 = Struct('<Q')
 
 
 class KeyMap:
@@ -10,13 +15,19 @@ class KeyMap:
 
     """
 
-    def __init__(self, size: int, block=1):
+    __slots__ = ('_size', '_mod', '_max', '_byte', '_block', '_mask', '_stats', 'extra')
+
+    def __init__(self, size: int, block=1, *, stats=False):
         assert size <= 2**256, 'size too large'
         self._size = size
         self._mod = 2**256 // size
         self._max = self._mod * size
-        self._byte = int(log2(size)//8) + 1
+        self._byte = (size.bit_length() + 7) // 8
         self._block = block
+        # power of two sizes divide 2**256, so no digest is ever rejected
+        self._mask = size - 1 if not size & (size - 1) else None
+        # record the hashes used by the last lookup only when asked
+        self._stats = stats
         self.extra = None
 
     @property
@@ -40,27 +51,31 @@ class KeyMap:
         """
 
         assert isinstance(key, bytes), 'KeyMap only supports bytes'
-        h = sha256()
-
-        extra = 0
-
-        def redo(new_key):
-            h.update(new_key)
-            new_key = h.digest()
-            return int.from_bytes(new_key, 'little'), new_key
-
-        i, key = redo(key)
-        extra += 1
+        if self._mask is not None:
+            if self._stats:
+                self.extra = 1
+            # only the low bytes of the digest survive the mask
+            i = int.from_bytes(sha256(key).digest()[:self._byte], 'little')
+            return (i & self._mask) * self._block
+
+        h = sha256(key)
+        key = h.digest()
+        i = int.from_bytes(key, 'little')
+
+        # rejected digests are fed back into the same hash
+        extra = 1
         while i >= self._max:
-            i, key = redo(key)
+            h.update(key)
+            key = h.digest()
+            i = int.from_bytes(key, 'little')
             extra += 1
-        i %= self._size
-        self.extra = extra
+        if self._stats:
+            self.extra = extra
 
-        return i * self._block
+        return i % self._size * self._block
 
     def increase(self, portion: float):
-        return self.__class__(round(self._size * portion), self._block)
+        return self.__class__(round(self._size * portion), self._block, stats=self._stats)
 
 
 def db_open(name: str, size: int, mode='r+b', block=512):
@@ -72,7 +87,7 @@ def db_open(name: str, size: int, mode='r+b', block=512):
     file.write(b'\0')
 
     # determine correct block size
-    key_size = int(log2(size)//1) + 1
+    key_size = size.bit_length()
 
     # generate key map
     keys = KeyMap(key_size, block)
@@ -87,6 +102,9 @@ class ExpansionError(DBError):
 
 
 class SparseDatabase:
+    __slots__ = ('file', 'maps', '_portion', '_map', '_cursor', '_first', '_last',
+                 '_filled', '_pos', '_keys', '_expansion', '_current')
+
     def __init__(self, file_obj: BufferedIOBase,
                  key_map: KeyMap,
                  init=False, *,
@@ -95,8 +113,16 @@ class SparseDatabase:
         self.maps = [key_map]
         self._portion = portion
 
+        # read through a map of the file when it can be mapped
+        try:
+            self._map = mmap(file_obj.fileno(), 0)
+        except (OSError, ValueError, UnsupportedOperation):
+            self._map = None
+
         # set the first and last pointers
         file_obj.seek(0)
+        # file position as last left by this database
+        self._cursor = 0
         if init:
             # empty pointers
             self._first = None
@@ -104,11 +130,12 @@ class SparseDatabase:
             # start fill tracking
             self._filled = 0
         else:
+            head = self._read_at(0, 96)
             # read pointers
-            self._first = int.from_bytes(file_obj.read(32), 'little')
-            self._last = int.from_bytes(file_obj.read(32), 'little')
+            self._first = int.from_bytes(head[0:32], 'little')
+            self._last = int.from_bytes(head[32:64], 'little')
             # get current fill
-            self._filled = int.from_bytes(file_obj.read(32), 'little')
+            self._filled = int.from_bytes(head[64:96], 'little')
         # add offset for pointers
         self._pos = 64
 
@@ -126,8 +153,8 @@ class SparseDatabase:
         return self
 
     def __next__(self):
-        self._seek(self._current + 32)
-        self._current = int.from_bytes(self.file.read(32), 'little')
+        pointer = self._read_at(self._pos + self._current + 32, 32)
+        self._current = int.from_bytes(pointer, 'little')
 
     def clear_cache(self):
         """Reset the tracked keys."""
@@ -145,8 +172,19 @@ class SparseDatabase:
     def expanding(self):
         return self._expansion
 
-    def _seek(self, pos: int):
-        self.file.seek(self._pos + pos)
+    def _read_at(self, offset: int, n: int) -> bytes:
+        """Read `n` bytes at an absolute file offset."""
+        end = offset + n
+        # the map only covers the file as it was when the database opened
+        if self._map is not None and end <= len(self._map):
+            # buffered writes are not visible through the map until flushed
+            self.file.flush()
+            return self._map[offset:end]
+        if offset != self._cursor:
+            self.file.seek(offset)
+        data = self.file.read(n)
+        self._cursor = offset + len(data)
+        return data
 
     def __getitem__(self, item):
         """Retrieve item from the database file."""
@@ -157,10 +195,14 @@ class SparseDatabase:
     def close(self):
         if self._expansion is not None:
             raise ExpansionError('attempt to close expanding database')
+        if self._map is not None:
+            self._map.close()
         self.file.close()
 
 
 class _Object:
+    __slots__ = ('key', 'n_key', 'data')
+
     def __init__(self, key: bytes, n_key: bytes, data: bytes = None):
         self.key = key
         self.n_key = n_key
@@ -172,14 +214,17 @@ class _Object:
     def read_object(cls, file: BufferedIOBase):
         new_key = file.read(cls.key_size)
 
-        obj_size = file.read(cls.key_size)
-        obj_size = int.from_bytes(obj_size, 'little')
+        obj_size = _U64.unpack(file.read(_U64.size))[0]
 
         new_data = file.read(obj_size)
 
-        return cls(new_key, new_data)
+        return cls(new_key, None, new_data)
+
+    def pack(self) -> bytes:
+        return b''.join((self.key,
+                         _U64.pack(len(self.data)),
+                         self.data))
 
     def byte_object(self, file: BufferedIOBase):
-        file.write(self.key)
-        file.write(len(self.data).to_bytes(len(self.key), 'little'))
-        file.write(self.data)
+        # one write per object
+        file.write(self.pack())
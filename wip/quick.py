@@ -2,18 +2,32 @@
 
 import pickle
 from io import BufferedIOBase
-from timeit import timeit
+from struct import Struct
+from time import perf_counter_ns
 
 
 # provide ability to change default protocol
 default_protocol = pickle.HIGHEST_PROTOCOL
 
+# length prefix of journal records
+_LEN = Struct('<I')
+
 
 class Error(Exception):
     pass
 
 
 class Quick:
+    """Keep a dict of bytes in a pickled snapshot with an appended journal.
+
+    Only changes made through `__setitem__` are journaled. Writing to `src`
+    directly is not recorded until the next full snapshot.
+
+    """
+
+    __slots__ = ('file', 'src', 'protocol', 'changed',
+                 '_pending', '_snapshot_size', '_journal_size')
+
     def __init__(self, file: BufferedIOBase,
                  src: dict = None,
                  protocol=default_protocol):
@@ -22,6 +36,11 @@ class Quick:
         self.protocol = protocol
         self.changed = False
 
+        # changes since the last dump are appended after the snapshot
+        self._pending = []
+        self._snapshot_size = None
+        self._journal_size = 0
+
     def __getitem__(self, key):
         return self.src[key]
 
@@ -29,11 +48,33 @@ class Quick:
         assert isinstance(key, bytes)
         assert isinstance(value, bytes)
         self.src[key] = value
+        self._pending.append((key, value))
         self.changed = True
 
     def dump(self):
-        self.file.seek(0)
-        pickle.dump(self.src, self.file, protocol=self.protocol)
+        # the first dump always writes a snapshot, including any initial src
+        if not self.changed and self._snapshot_size is not None:
+            return
+
+        records = []
+        for key, value in self._pending:
+            records += _LEN.pack(len(key)), key, _LEN.pack(len(value)), value
+        journal_size = self._journal_size + sum(map(len, records))
+
+        if self._snapshot_size is None or journal_size > self._snapshot_size // 2:
+            # compact the journal into a new snapshot
+            self.file.seek(0)
+            pickle.dump(self.src, self.file, protocol=self.protocol)
+            self._snapshot_size = self.file.tell()
+            self._journal_size = 0
+        else:
+            self.file.seek(self._snapshot_size + self._journal_size)
+            self.file.writelines(records)
+            self._journal_size = journal_size
+        # drop anything left past the end, such as a torn record
+        self.file.truncate()
+
+        self._pending.clear()
         self.changed = False
 
     def load(self):
@@ -42,19 +83,48 @@ class Quick:
         else:
             try:
                 self.file.seek(0)
-                pickle.load(self.file)
+                self.src = pickle.load(self.file)
             except EOFError:
                 self.src = {}
+                self._snapshot_size = None
                 self.changed = True
+            else:
+                self._snapshot_size = self.file.tell()
+                self._journal_size = self._replay(self.file.read())
+
+    def _replay(self, journal):
+        """Apply journal records to src, returning the bytes used."""
+        src = self.src
+        unpack = _LEN.unpack_from
+        size = _LEN.size
+        end = len(journal)
+        place = 0
+        while place + size <= end:
+            n = unpack(journal, place)[0]
+            key_end = place + size + n
+            if key_end + size > end:
+                break
+            m = unpack(journal, key_end)[0]
+            value_end = key_end + size + m
+            if value_end > end:
+                break
+            src[journal[place + size:key_end]] = journal[key_end + size:value_end]
+            place = value_end
+        # anything past here is an incomplete record from an interrupted dump
+        return place
 
     def close(self):
         self.file.close()
 
     @property
     def time(self):
-        d_speed = timeit('self.dump()', number=1, globals=locals())
-        l_speed = timeit('self.load()', number=1, globals=locals())
-        return d_speed, l_speed
+        start = perf_counter_ns()
+        self.dump()
+        d_speed = perf_counter_ns() - start
+        start = perf_counter_ns()
+        self.load()
+        l_speed = perf_counter_ns() - start
+        return d_speed * 1e-9, l_speed * 1e-9
 
 
 class Priority:
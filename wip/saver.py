@@ -1,12 +1,20 @@
 """Module of Save class and utilities."""
 
 from abc import ABCMeta, abstractmethod
+from os import fstat
 from pathlib import Path
 from threading import Lock
-from collections import namedtuple
+from mmap import mmap, ACCESS_READ, ACCESS_WRITE
+from collections import namedtuple, OrderedDict
+from functools import partial
+from struct import Struct, error as StructError
 
 
-Info = namedtuple('Info', 'offset key_size converter')
+Info = namedtuple('Info', 'offset size converter')
+# marks a value absent from the cache
+_MISSING = object()
+# values that can be compared with a cached copy
+_IMMUTABLE = frozenset((int, float, str, bytes))
 
 
 class Error(Exception):
@@ -26,12 +34,23 @@ class FixedMeta(ABCMeta):
 
     @classmethod
     def get_converter(mcs, s_type, size: int, *args, **kwargs):
+        # converters do not change after creation, so equal ones are shared
+        key = s_type, size, args, tuple(sorted(kwargs.items()))
         try:
-            return mcs._supported_types[s_type](size, *args, **kwargs)
-        except KeyError:
-            raise TypeError('%r does not have a converter' % s_type)
+            converter = mcs._converters.get(key)
+        except TypeError:
+            key = converter = None  # unhashable arguments
+        if converter is None:
+            try:
+                converter = mcs._supported_types[s_type](size, *args, **kwargs)
+            except KeyError:
+                raise TypeError('%r does not have a converter' % s_type)
+            if key is not None:
+                mcs._converters[key] = converter
+        return converter
 
     _supported_types = {}
+    _converters = {}
 
 
 class ConverterBase(metaclass=FixedMeta):
@@ -96,11 +115,17 @@ class Save:
         self._flag = flag
         self._file = path.open(flag, buffering=0)
         self._is_closed = False
+        # sections are accessed through a map of the file, made on first use
+        self._map = None
 
         # set current offset for registering
         self._offset = 0
         self._binding = {}
-        self._cache = {}
+        # per section accessors built from the binding
+        self._getters = {}
+        self._setters = {}
+        # recently used objects, oldest first
+        self._cache = OrderedDict()
 
         # implement thread safe locking
         self._lock = Lock()
@@ -119,14 +144,18 @@ class Save:
         """
 
         converter = FixedMeta.get_converter(s_type, size, *args, **kwargs)
-        self._binding[name] = Info(self._offset,
-                                   size,
-                                   converter)
-        if not self._existed:
-            self._file.seek(self._offset)
-            self._file.write(bytes(size))
+        self._binding[name] = info = Info(self._offset,
+                                          size,
+                                          converter)
+        self._bind(name, info)
+        # space is reserved in one step when the file is next mapped
         self._offset += size
 
+        # the map is remade to cover the new section
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
         def hook(default):
             self.default(name, default)
         return hook
@@ -138,36 +167,84 @@ class Save:
     @binding.setter
     def binding(self, bind: dict):
         self._binding = bind.copy()
+        self._getters.clear()
+        self._setters.clear()
+        for name, info in self._binding.items():
+            self._bind(name, info)
+
+    def _bind(self, name, info):
+        """Build the get and set functions for a section."""
+
+        start = info.offset
+        size = info.size
+        end = start + size
+        from_bytes = info.converter.from_bytes
+        to_bytes = info.converter.to_bytes
+        cache = self._cache
+        mapped = self._mapped
+        cache_put = self._cache_put
+
+        def get():
+            obj = cache.get(name, _MISSING)
+            if obj is _MISSING:
+                obj = from_bytes(mapped()[start:end])
+                cache_put(name, obj)
+            else:
+                cache.move_to_end(name)
+            return obj
+
+        def set_(obj):
+            # writing an unchanged immutable value would change nothing
+            if type(obj) in _IMMUTABLE:
+                prev = cache.get(name, _MISSING)
+                if type(prev) is type(obj) and prev == obj:
+                    return
+            data = to_bytes(obj)
+            if len(data) != size:
+                raise Error('data key_size != %s' % size)
+            mapped()[start:end] = data
+            cache_put(name, obj)
+
+        self._getters[name] = get
+        self._setters[name] = set_
 
     def info(self, key):
         return self._binding[key]
 
+    def _mapped(self):
+        if self._map is None:
+            fileno = self._file.fileno()
+            # zero fill any sections registered past the end of the file
+            if fstat(fileno).st_size < self._offset:
+                self._file.truncate(self._offset)
+            writable = '+' in self._flag or 'w' in self._flag
+            self._map = mmap(fileno, self._offset,
+                             access=ACCESS_WRITE if writable else ACCESS_READ)
+        return self._map
+
     def __getitem__(self, key):
         try:
-            info = self._binding[key]
+            get = self._getters[key]
         except KeyError:
             raise Error('no binding for key %r' % key) from None
-        try:
-            return self._cache[key]
-        except KeyError:
-            self._file.seek(info.offset)
-            data = self._file.read(info.size)
-            obj = info.converter.from_bytes(data)
-            self._cache[key] = obj
-            return obj
+        return get()
 
     def __setitem__(self, key, obj):
         try:
-            info = self._binding[key]
+            set_ = self._setters[key]
         except KeyError:
             raise Error('no binding for key %r' % key) from None
-        data = info.converter.to_bytes(obj)
+        set_(obj)
 
-        if len(data) != info.size:
-            raise Error('data key_size != %s' % info.size)
-        self._file.seek(info.offset)
-        self._file.write(data)
-        self._cache[key] = obj
+    # most objects kept by the cache
+    _cache_max = 1024
+
+    def _cache_put(self, key, obj):
+        cache = self._cache
+        cache[key] = obj
+        cache.move_to_end(key)
+        if len(cache) > self._cache_max:
+            cache.popitem(last=False)
 
     def default(self, key, obj):
         if not self._existed:
@@ -201,8 +278,13 @@ class Save:
     def open(self):
         if self.is_closed:
             self._file = self._path.open(self._flag, buffering=0)
+            self._is_closed = False
 
     def close(self):
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
         self._file.close()
         self._is_closed = True
 
@@ -218,33 +300,62 @@ class Save:
             return '<%s at %s>' % info
 
 
+# struct codes for signed ints by size
+_INT_CODES = {1: 'b', 2: 'h', 4: 'i', 8: 'q'}
+
+
 class IntConverter(ConverterBase, s_type=int):
     def __init__(self, size: int, endian='little', *, signed=False):
         super().__init__(size)
         self._endian = endian
         self._signed = signed
+        code = _INT_CODES.get(size)
+        if code is not None:
+            # common sizes are packed by a precompiled struct
+            code = code if signed else code.upper()
+            packer = Struct(('<' if endian == 'little' else '>') + code)
+            self._pack = packer.pack
+            self._unpack = packer.unpack
+        else:
+            # int.to_bytes already rejects objects that are not ints
+            self._pack = partial(int.to_bytes, length=size, byteorder=endian, signed=signed)
+            self._unpack = None
 
     def to_bytes(self, obj) -> bytes:
-        if not isinstance(obj, int):
-            raise TypeError('%r is not an int' % obj)
-        return obj.to_bytes(self._size, self._endian, signed=self._signed)
+        try:
+            return self._pack(obj)
+        except StructError:
+            # raise what int.to_bytes would for other sizes
+            if not isinstance(obj, int):
+                raise TypeError('%r is not an int' % obj) from None
+            raise OverflowError('int too big to convert') from None
 
     def from_bytes(self, b):
+        if self._unpack is not None and len(b) == self._size:
+            return self._unpack(b)[0]
         return int.from_bytes(b, self._endian, signed=self._signed)
 
 
 class StrConverter(ConverterBase, s_type=str):
-    def __init__(self, size: int, encoding='utf-8', errors='strict'):
+    def __init__(self, size: int, encoding='utf-8', errors='strict', *, checked=True):
         super().__init__(size)
         self._encoding = encoding
         self._errors = errors
+        if not checked:
+            # leave type and length errors to the caller
+            self.to_bytes = self._to_bytes_unchecked
 
     def to_bytes(self, obj) -> bytes:
         if not isinstance(obj, str):
             raise TypeError('%r is not a str' % obj)
-        if len(obj) > self._size:
-            raise ValueError('len(str) must be < %s' % self._size)
-        return obj.encode(self._encoding, self._errors) + bytes(self._size - len(obj))
+        data = obj.encode(self._encoding, self._errors)
+        # the limit applies to the encoded length, not the characters
+        if len(data) > self._size:
+            raise ValueError('encoded str must be at most %s bytes' % self._size)
+        return data.ljust(self._size, b'\x00')
+
+    def _to_bytes_unchecked(self, obj) -> bytes:
+        return obj.encode(self._encoding, self._errors).ljust(self._size, b'\x00')
 
     def from_bytes(self, b):
         return b.rstrip(b'\x00').decode(self._encoding, self._errors)